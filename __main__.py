@@ -1,5 +1,8 @@
 import asyncio
-from src.app import main
+import sys
+from src.app import main, validate
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    if sys.argv[1:2] == ['validate']:
+        sys.exit(0 if asyncio.run(validate(*sys.argv[2:3])) else 1)
+    asyncio.run(main(fmt=sys.argv[1] if sys.argv[1:2] == ['jsonl'] else 'csv'))
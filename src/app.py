@@ -2,14 +2,17 @@ from time import perf_counter
 
 import asyncio
 from joblib import Parallel
-from src.generators import ErpDataGenerator
+from src.generators import DEFAULT_SEED, ErpDataGenerator
+from src.validators import validate_dataset
 
 
 async def main(
         batch_size: int = 1_000,
         companies: int = 1_000,
         inv_per_period: int = 1_000,
-        n_jobs: int = 8
+        n_jobs: int = 8,
+        seed: int = DEFAULT_SEED,
+        fmt: str = 'csv'
 ):
 
     start = perf_counter()
@@ -18,12 +21,20 @@ async def main(
         Parallel(n_jobs=n_jobs, verbose=10),
         batch_size,
         companies,
-        inv_per_period
+        inv_per_period,
+        seed,
+        fmt
     )
 
     end = perf_counter() - start
     print(f"Total time: {end:.3f}")
 
 
+async def validate(data_dir: str = 'data', chunk_size: int = 100_000) -> bool:
+    report = validate_dataset(data_dir, chunk_size)
+    print(report)
+    return report.ok
+
+
 if __name__ == '__main__':
     asyncio.run(main())
@@ -0,0 +1,123 @@
+import operator
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Generic, Iterator, TypeVar
+
+import numpy as np
+
+from src.generators import DEFAULT_SEED, CompanyInfo, create_date_ranges, create_invoice
+from src.generators import create_payment, make_company, make_faker, sample_period_companies
+from src.models import Company, Invoice, Payment
+
+T = TypeVar('T')
+
+
+class LazySequence(Generic[T]):
+    """
+    A read only sequence of generated records. Records are only created when
+    they are accessed, so indexing, slicing and iterating only generate the
+    requested range. Positions are zero based while record ids start at 1.
+    """
+
+    def __init__(self, length: int, make: Callable[[int], T]):
+        self._length = length
+        self._make = make
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self._make(i + 1) for i in range(*index.indices(self._length))]
+        index = operator.index(index)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"Index {index} out of range for {self._length} records")
+        return self._make(index + 1)
+
+    def __iter__(self) -> Iterator[T]:
+        return (self._make(i + 1) for i in range(self._length))
+
+
+class ErpDataset:
+    """
+    A lazy view of the dataset `ErpDataGenerator.generate_company_dataset`
+    produces for the same seed. Any company, invoice or payment can be
+    generated by id without generating the records before it.
+
+    Invoice ids are allocated to periods in blocks of `inv_per_period` and each
+    invoice is paid by the payment with the same id.
+    """
+
+    def __init__(self, total_companies: int, inv_per_period: int,
+                 seed: int = DEFAULT_SEED,
+                 periods: list[tuple[date, date]] | None = None,
+                 active_pct: float = .20):
+        self.total_companies = total_companies
+        self.inv_per_period = inv_per_period
+        self.seed = seed
+        self.periods = periods if periods is not None else create_date_ranges()
+        self.active_pct = active_pct
+
+        # Companies are generated with a Faker of our own, so reading from the
+        # dataset leaves the shared generator untouched
+        self._faker = make_faker()
+
+        self._period_companies = lru_cache(maxsize=128)(self._sample_companies)
+
+        self.companies: LazySequence[Company] = LazySequence(total_companies, self.company)
+        self.invoices: LazySequence[Invoice] = LazySequence(
+            len(self.periods) * inv_per_period, self.invoice)
+        self.payments: LazySequence[Payment] = LazySequence(len(self.invoices), self.payment)
+
+    def _sample_companies(self, period_index: int) -> np.ndarray:
+        return sample_period_companies(period_index, self.total_companies,
+                                       self.active_pct, self.seed)
+
+    @staticmethod
+    def _check_id(record_id: int, count: int, kind: str) -> int:
+        record_id = operator.index(record_id)
+        if not 1 <= record_id <= count:
+            raise KeyError(f"No {kind} with id {record_id}")
+        return record_id
+
+    def company(self, company_id: int) -> Company:
+        """
+        Generate the company with the given id.
+        """
+        company_id = self._check_id(company_id, self.total_companies, 'company')
+        return make_company(company_id, self.seed, self._faker)
+
+    def invoice(self, invoice_id: int) -> Invoice:
+        """
+        Generate the invoice with the given id, along with the company it is
+        billed to.
+        """
+        invoice_id = self._check_id(invoice_id, len(self.invoices), 'invoice')
+        period_index, offset = divmod(invoice_id - 1, self.inv_per_period)
+        companies = self._period_companies(period_index)
+        if not len(companies):
+            raise KeyError(f"No companies are active for invoice {invoice_id}")
+
+        company_id = int(companies[offset % len(companies)]) + 1
+        company = self.company(company_id)
+        company_info = CompanyInfo(company.customer_id,
+                                   company.display_contact.print_as)
+
+        return create_invoice(company_info, invoice_id, self.periods[period_index],
+                              seed=self.seed)
+
+    def payment(self, payment_id: int) -> Payment:
+        """
+        Generate the payment with the given id.
+        """
+        payment_id = self._check_id(payment_id, len(self.payments), 'payment')
+        return create_payment(self.invoice(payment_id).summary, payment_id,
+                              seed=self.seed)
+
+    def invoice_payments(self, invoice_id: int) -> list[Payment]:
+        """
+        Generate the payments made against the given invoice.
+        """
+        return [self.payment(invoice_id)]
@@ -1,6 +1,8 @@
 import os
-from itertools import cycle
 import json
+import operator
+from collections import namedtuple
+from typing import TYPE_CHECKING
 import jsonpickle
 import numpy as np
 import pandas as pd
@@ -10,19 +12,92 @@ from faker.providers import address, internet, person, company, date_time, phone
 from joblib import Parallel, delayed
 from src.models import Contact, MailAddress, Company, Invoice, LineItem, Payment, PaymentItem
 from src.models import InvoiceSummary
-from src.utils import serialize_payment
+from src.utils import serialize_payment, write_jsonl
 
-fake = Faker('en_US')
-fake.add_provider(person)
-fake.add_provider(address)
-fake.add_provider(company)
-fake.add_provider(date_time)
-fake.add_provider(internet)
-fake.add_provider(phone_number)
-Faker.seed(42)
+if TYPE_CHECKING:
+    from src.datasets import ErpDataset
 
 
-def make_contact(contact_id: int, company_name: str) -> Contact:
+def make_faker() -> Faker:
+    """
+    Create a Faker with the providers used to generate the dataset.
+    """
+    faker = Faker('en_US')
+    faker.add_provider(person)
+    faker.add_provider(address)
+    faker.add_provider(company)
+    faker.add_provider(date_time)
+    faker.add_provider(internet)
+    faker.add_provider(phone_number)
+    return faker
+
+
+fake = make_faker()
+
+DEFAULT_SEED = 42
+
+OUTPUT_FORMATS = ('csv', 'jsonl')
+"""Formats the dataset can be written in. jsonl exports use camel cased keys."""
+
+CompanyInfo = namedtuple('CompanyInfo', ['company_id', 'contact_name'])
+
+COMPANY_STREAM = 0
+INVOICE_STREAM = 1
+PAYMENT_STREAM = 2
+PERIOD_STREAM = 3
+
+MAX_SEED = 2 ** 64
+MAX_COUNTER = 2 ** 48
+
+
+def stream_key(seed: int, stream: int, counter: int) -> int:
+    """
+    Combine the dataset seed, the stream for the kind of record and the record
+    id into a single key. Each record gets its own independent random stream,
+    so it can be generated on its own without replaying the records before it.
+    The seed occupies the upper 64 bits of the key, the stream the next 16 and
+    the counter the lower 48.
+
+    >>> stream_key(42, INVOICE_STREAM, 7) == (42 << 64) | (1 << 48) | 7
+    True
+
+    Args:
+        seed (): The seed for the dataset, in the range [0, 2**64).
+        stream (): The stream for the kind of record being generated.
+        counter (): The id of the record within its stream, in the range
+            [0, 2**48).
+
+    Returns:
+        An integer key unique to the record.
+
+    Raises:
+        TypeError: If the seed or counter is not an integer.
+        ValueError: If the seed or counter is out of range.
+    """
+    seed, counter = operator.index(seed), operator.index(counter)
+    if not 0 <= seed < MAX_SEED:
+        raise ValueError(f"Seed must be in the range [0, 2**64), got {seed}")
+    if not 0 <= counter < MAX_COUNTER:
+        raise ValueError(f"Record id must be in the range [0, 2**48), got {counter}")
+    return (seed << 64) | (stream << 48) | counter
+
+
+def make_rng(seed: int, stream: int, counter: int) -> np.random.Generator:
+    """
+    Create a counter-based Philox random generator keyed by the given record.
+    """
+    return np.random.Generator(np.random.Philox(key=stream_key(seed, stream, counter)))
+
+
+def random_date(rng: np.random.Generator, start: date, end: date) -> date:
+    """
+    Pick a random date between the start and end date, inclusive.
+    """
+    return start + timedelta(days=int(rng.integers((end - start).days + 1)))
+
+
+def make_contact(contact_id: int, company_name: str,
+                 faker: Faker = fake) -> Contact:
     """
     Create a Contact with fake information and mailing address that belongs
     to the supplied company id. Generated names are not guaranteed to be unique,
@@ -33,11 +108,12 @@ def make_contact(contact_id: int, company_name: str) -> Contact:
     Args:
         contact_id (): The contact id for the current Contact.
         company_name (): The company name this Contact will be associated with.
+        faker (): The Faker to generate the contact with.
 
     Returns:
         A Contact with the given id belonging to the specified company.
     """
-    full_name = fake.name()
+    full_name = faker.name()
     names = full_name.split(' ')
 
     return Contact(
@@ -45,33 +121,40 @@ def make_contact(contact_id: int, company_name: str) -> Contact:
         first_name=f"{names[0]}",
         last_name=f"{names[1]} {contact_id}",
         company_name=f"{company_name}-{contact_id}",
-        email1=fake.safe_email(),
-        phone1=fake.phone_number(),
-        phone2=fake.phone_number(),
+        email1=faker.safe_email(),
+        phone1=faker.phone_number(),
+        phone2=faker.phone_number(),
         mail_address=MailAddress(
-            address1=fake.street_address(),
+            address1=faker.street_address(),
             address2=f"Attn: {contact_id}",
-            city=fake.city(),
-            state=fake.state(),
-            country=fake.current_country_code(),
-            zip=fake.postcode()
+            city=faker.city(),
+            state=faker.state(),
+            country=faker.current_country_code(),
+            zip=faker.postcode()
         )
     )
 
 
-def make_company(company_id: int) -> Company:
+def make_company(company_id: int, seed: int = DEFAULT_SEED,
+                 faker: Faker = fake) -> Company:
     """
     Create a company with the given id number. Sets the default ar account for
-    the company and adds a primary contact.
+    the company and adds a primary contact. The fake data is seeded from the
+    company id, so the same company is produced for the same seed no matter
+    which batch or worker creates it.
 
     Args:
         company_id (): An integer based id value for the current company.
+        seed (): The seed for the dataset.
+        faker (): The Faker to generate the company with. It is reseeded for
+            the company.
 
     Returns:
         A Company with a display contact and completed information.
     """
-    company_name = fake.company()
-    contact = make_contact(company_id, company_name)
+    faker.seed_instance(stream_key(seed, COMPANY_STREAM, company_id))
+    company_name = faker.company()
+    contact = make_contact(company_id, company_name, faker)
 
     return Company(
         customer_id=f"C{company_id}",
@@ -82,7 +165,8 @@ def make_company(company_id: int) -> Company:
     )
 
 
-def make_company_batch(start_id: int = 0, batch_size: int = 10) -> pd.DataFrame:
+def make_company_batch(start_id: int = 0, batch_size: int = 10,
+                       seed: int = DEFAULT_SEED) -> pd.DataFrame:
     """
     Create a batch of company objects starting at the given id.
 
@@ -91,17 +175,46 @@ def make_company_batch(start_id: int = 0, batch_size: int = 10) -> pd.DataFrame:
             id will not be in the current list as the ids will be indexed
             by 1. e.x. The first id for `start_id` = 0 will be 1
         batch_size (): The number of companies to generate for the current batch.
+        seed (): The seed for the dataset.
 
     Returns:
         A list of Company objects with fabricated data.
     """
 
-    companies = [make_company(start_id + i + 1) for i in range(batch_size)]
+    companies = [make_company(start_id + i + 1, seed) for i in range(batch_size)]
     pickled_stuff = jsonpickle.encode(companies, unpicklable=False)
     return pd.json_normalize(json.loads(pickled_stuff))
 
 
-def write_invoice_period(start_date: date, invoices: list[Invoice]):
+def write_company_batch(batch_id: int, start_id: int, batch_size: int,
+                        seed: int = DEFAULT_SEED) -> list[CompanyInfo]:
+    """
+    Create a batch of companies and write them to a .jsonl file in the
+    `data/companies` folder.
+
+    Args:
+        batch_id (): The number of the batch, used to name the file.
+        start_id (): The id before the first company in the batch.
+        batch_size (): The number of companies to generate for the current batch.
+        seed (): The seed for the dataset.
+
+    Returns:
+        The id and contact name of each company in the batch.
+    """
+    companies = [make_company(start_id + i + 1, seed) for i in range(batch_size)]
+    os.makedirs('data/companies', exist_ok=True)
+    write_jsonl(f"data/companies/companies_batch_{batch_id}.jsonl", companies)
+
+    return [CompanyInfo(c.customer_id, c.display_contact.print_as) for c in companies]
+
+
+def write_invoice_period(start_date: date, invoices: list[Invoice], fmt: str = 'csv'):
+    if fmt == 'jsonl':
+        os.makedirs('data/invoices', exist_ok=True)
+        write_jsonl(f"data/invoices/invoices_{start_date.year}_{start_date.month}.jsonl",
+                    invoices)
+        return
+
     pickled_invoices = jsonpickle.encode(invoices, unpicklable=False)
     df = pd.json_normalize(json.loads(pickled_invoices))
     df.drop(['invoice_items'], axis=1, inplace=True)
@@ -113,27 +226,38 @@ def write_invoice_period(start_date: date, invoices: list[Invoice]):
 
 
 def generate_companies(parallel: Parallel, batch_size: int,
-                       total_companies: int) -> list[tuple[str, str]]:
+                       total_companies: int,
+                       seed: int = DEFAULT_SEED,
+                       fmt: str = 'csv') -> list[tuple[str, str]]:
     """
     Generates fake company data records and outputs a flattened .csv to the data
     folder. The fake data batch is split into equal sized chunks to generate a
-    dataset with the specified total number of companies. If The total number of
-    companies to generate is less than the batch size, then only one batch will
-    be processed.
+    dataset with the specified total number of companies, with any remainder
+    generated in a final smaller batch. If The total number of companies to
+    generate is less than the batch size, then only one batch will be processed.
 
     Args:
         parallel (Parallel): An instance of `joblib` Parallel
         batch_size (): The size of each batch to process when creating dataset.
         total_companies (): The total number of company records to create.
+        seed (): The seed for the dataset.
+        fmt (): The output format. For jsonl each batch is written to its own
+            file by the worker that generates it.
 
     Returns:
         A list of ids for the generated companies.
     """
-    batch_ct = total_companies // batch_size
-    item_list = [i * batch_size for i in range(batch_ct)]
+    item_list = range(0, total_companies, batch_size)
+
+    if fmt == 'jsonl':
+        batches = parallel(
+            delayed(write_company_batch)(b + 1, i, min(batch_size, total_companies - i), seed)
+            for b, i in enumerate(item_list)
+        )
+        return [info for batch in batches for info in batch]
 
     result_frames = parallel(
-        delayed(make_company_batch)(i, batch_size)
+        delayed(make_company_batch)(i, min(batch_size, total_companies - i), seed)
         for i in item_list
     )
 
@@ -226,18 +350,19 @@ def create_date_ranges(years_back: int = 2) -> list[list[tuple[date, date]]]:
 
 
 def create_payment(invoice_info: InvoiceSummary, payment_id: int,
-                   multiple_pct: float = .80) -> Payment:
+                   multiple_pct: float = .80, seed: int = DEFAULT_SEED) -> Payment:
+    rng = make_rng(seed, PAYMENT_STREAM, int(payment_id))
     # For now, just pay in full
     left_to_pay = invoice_info.total_amount
     # Pick a random date within the posted and due date
-    date_paid = date_rcv = fake.date_between(invoice_info.date_posted,
-                                             invoice_info.date_due)
+    date_paid = date_rcv = random_date(rng, invoice_info.date_posted,
+                                       invoice_info.date_due)
     payment_items = []
 
     # Decide if we make multiple payments
-    partial_roll = np.random.random_sample()
+    partial_roll = rng.random()
     if partial_roll > multiple_pct:
-        fraction = (.60 - .20) * np.random.random_sample() + 0.20
+        fraction = (.60 - .20) * rng.random() + 0.20
         item_payment = round(left_to_pay * partial_roll, 2)
         left_to_pay -= item_payment
         payment_items.append(
@@ -267,31 +392,35 @@ def create_payment(invoice_info: InvoiceSummary, payment_id: int,
 
 
 def create_payment_batch(invoices: list[InvoiceSummary], payment_ids: list[int],
-                         batch_id: int):
+                         batch_id: int, seed: int = DEFAULT_SEED, fmt: str = 'csv'):
     if len(invoices) != len(payment_ids):
         raise ValueError("Must supply the same number of invoices and payment ids")
 
     payment_batch = [
-        create_payment(i, p_id) for i, p_id in zip(invoices, payment_ids)
+        create_payment(i, p_id, seed=seed) for i, p_id in zip(invoices, payment_ids)
     ]
 
     if not os.path.exists('data/payments'):
         os.makedirs('data/payments')
 
-    write_payment_batch(batch_id, payment_batch)
+    write_payment_batch(batch_id, payment_batch, fmt)
+
 
+def write_payment_batch(batch_id: int, payments: list[Payment], fmt: str = 'csv'):
+    if fmt == 'jsonl':
+        write_jsonl(f"data/payments/payments_batch_{batch_id}.jsonl", payments)
+        return
 
-def write_payment_batch(batch_id: int, payments: list[Payment]):
-    pickled_payments = [i for p in payments for i in serialize_payment(p)]
-    pickled_payments = json.dumps(pickled_payments)
+    rows = [i for p in payments for i in serialize_payment(p)]
 
-    df = pd.json_normalize(json.loads(pickled_payments))
+    df = pd.DataFrame(rows)
     df['total_remaining'] = 0
 
     df.to_csv(f"data/payments/payments_batch_{batch_id}", index=False)
 
 
-def generate_payments(parallel: Parallel, invoice_sums: list[list[InvoiceSummary]]):
+def generate_payments(parallel: Parallel, invoice_sums: list[list[InvoiceSummary]],
+                      seed: int = DEFAULT_SEED, fmt: str = 'csv'):
     # We need some ids! -> 1 for each invoice in the list
     invoice_count = sum(map(len, invoice_sums))
     batches = len(invoice_sums)
@@ -302,39 +431,48 @@ def generate_payments(parallel: Parallel, invoice_sums: list[list[InvoiceSummary
     batch_ids = [i + 1 for i in range(batches)]
 
     parallel(
-        delayed(create_payment_batch)(invoices, ids, batch)
+        delayed(create_payment_batch)(invoices, ids, batch, seed, fmt)
         for batch, invoices, ids
         in zip(batch_ids, invoice_sums, payment_ids)
     )
 
 
-def create_invoice(company_info: tuple[str, str], invoice_info: tuple[int, float],
-                   period: tuple[date, date]) -> Invoice:
+def create_invoice(company_info: tuple[str, str], invoice_id: int,
+                   period: tuple[date, date],
+                   low: float = 50.00,
+                   high: float = 100000,
+                   seed: int = DEFAULT_SEED) -> Invoice:
     """
-    Create an invoice for the given company
+    Create an invoice for the given company. The date and amount are drawn from
+    the random stream for the invoice id.
+
     Args:
         company_info (): The company info to assign this invoice to.
-        invoice_info (): A tuple of the invoice id and amount to bill.
+        invoice_id (): The id of the invoice.
         period (): The date range to use for the invoice.
+        low (): The minimum amount for the invoice.
+        high (): The maximum amount for the invoice
+        seed (): The seed for the dataset.
 
     Returns:
         An invoice for the given company id with the provided date and number.
     """
+    rng = make_rng(seed, INVOICE_STREAM, int(invoice_id))
     # Fake a date between the range we have
-    fake_date = fake.date_between(period[0], period[1])
-    # id, amt = invoice_info
+    fake_date = random_date(rng, period[0], period[1])
+    amount = round((high - low) * rng.random() + low, 2)
 
     line_items = [
         LineItem(
-            amount=invoice_info[1],
+            amount=amount,
             account_label="4000",
-            invoice_id=f"{invoice_info[0]}",
+            invoice_id=f"{invoice_id}",
             invoice_line=1
         )
     ]
 
     return Invoice(
-        invoice_id=f"{invoice_info[0]}",
+        invoice_id=f"{invoice_id}",
         customer_id=company_info.company_id,
         date_created=fake_date,
         date_posted=fake_date,
@@ -352,10 +490,13 @@ def create_invoice(company_info: tuple[str, str], invoice_info: tuple[int, float
 def create_invoice_batch(period: tuple[date, date], invoice_ids: list[int],
                          companies: list[tuple[str, str]],
                          low: float = 50.00,
-                         high: float = 100000) -> list[Invoice]:
+                         high: float = 100000,
+                         seed: int = DEFAULT_SEED) -> list[Invoice]:
     """
     Create a batch of invoices for the provided company that fall within the
-    start and end dates provided.
+    start and end dates provided. Companies are assigned to the invoices in
+    turn, so the company for an invoice only depends on its position in the
+    period.
 
     Args:
         period (): A tuple of start and end dates.
@@ -363,30 +504,47 @@ def create_invoice_batch(period: tuple[date, date], invoice_ids: list[int],
         companies (): The company ids to use for generating this batch.
         low (): The minimum amount for the invoice.
         high (): The maximum amount for the invoice
+        seed (): The seed for the dataset.
 
     Returns:
         A list of invoices for the companies between the given date range.
     """
-    # TODO shuffle the invoice ids and split them to the companies
-    np.random.shuffle(invoice_ids)
-    # TODO Create some invoice amounts between min and max
-    amounts = (high - low) * np.random.random_sample(len(invoice_ids)) + low
-    amounts = [round(amt, 2) for amt in amounts]
-    # Zip up the amounts with the invoices
-    invoice_with_amounts = list(zip(invoice_ids, amounts))
-    company_cycle = cycle(companies)
+    if not companies:
+        return []
 
     return [
-        create_invoice(c, inv, period)
-        for c, inv in zip(company_cycle, invoice_with_amounts)
+        create_invoice(companies[i % len(companies)], inv, period, low, high, seed)
+        for i, inv in enumerate(invoice_ids)
     ]
 
 
+def sample_period_companies(period_index: int, company_ct: int,
+                            active_pct: float = .20,
+                            seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Pick the active companies for a period. The companies are sampled with
+    replacement from the random stream for the period.
+
+    Args:
+        period_index (): The index of the period in the date ranges.
+        company_ct (): The total number of companies.
+        active_pct (): The fraction of companies to invoice in the period.
+        seed (): The seed for the dataset.
+
+    Returns:
+        An array of indices into the company list.
+    """
+    rng = make_rng(seed, PERIOD_STREAM, period_index)
+    return rng.choice(company_ct, int(company_ct * active_pct))
+
+
 def generate_invoices(parallel: Parallel,
                       periods: list[list[tuple[date, date]]],
                       companies: list[tuple[str, str]],
                       per_period: int, start_id: int = 0,
-                      active_pct: float = .20) -> list[list[InvoiceSummary]]:
+                      active_pct: float = .20,
+                      seed: int = DEFAULT_SEED,
+                      fmt: str = 'csv') -> list[list[InvoiceSummary]]:
     period_count = len(periods)
     invoice_ids = [i + 1 for i in range(start_id, period_count * per_period)]
 
@@ -394,25 +552,22 @@ def generate_invoices(parallel: Parallel,
     company_ct = len(companies)
     invoice_ids = np.array_split(invoice_ids, period_count)
 
-    # Sample some indexes
-    n_samples = (int(company_ct * active_pct))
-
     # Grab some random indices
     indices = [
-        np.random.choice(company_ct, n_samples)
-        for _ in range(period_count)
+        sample_period_companies(p, company_ct, active_pct, seed)
+        for p in range(period_count)
     ]
 
     company_samples = [[companies[idx] for idx in idx_arr] for idx_arr in indices]
 
     # Zip the periods and ids together and start building invoices
     results = parallel(
-        delayed(create_invoice_batch)(period, ids, sample)
+        delayed(create_invoice_batch)(period, ids, sample, seed=seed)
         for period, ids, sample in zip(periods, invoice_ids, company_samples)
     )
 
     parallel(
-        delayed(write_invoice_period)(period[0], i_batch)
+        delayed(write_invoice_period)(period[0], i_batch, fmt)
         for period, i_batch in zip(periods, results)
     )
 
@@ -421,16 +576,38 @@ def generate_invoices(parallel: Parallel,
 
 class ErpDataGenerator:
 
+    @staticmethod
+    def dataset(total_companies: int, inv_per_period: int,
+                seed: int = DEFAULT_SEED) -> 'ErpDataset':
+        """
+        Create a lazy view of the dataset that `generate_company_dataset` would
+        output for the same arguments. Records are only generated as they are
+        accessed.
+
+        Args:
+            total_companies (int): The total number of companies in the dataset
+            inv_per_period (int): The number of invoices in each period
+            seed (int): The seed for the dataset
+
+        Returns:
+            An ErpDataset for the given arguments.
+        """
+        from src.datasets import ErpDataset
+        return ErpDataset(total_companies, inv_per_period, seed)
+
     @staticmethod
     async def generate_company_dataset(parallel: Parallel,
                                        batch_size: int,
                                        total_companies: int,
-                                       inv_per_period: int) -> None:
+                                       inv_per_period: int,
+                                       seed: int = DEFAULT_SEED,
+                                       fmt: str = 'csv') -> None:
         """
         Generate a company dataset using the given batch size to create a specified
         number of total companies. The generated datasets will be output to
-        `{project-root}/data/` in .csv format. The following dataset files will be
-        created during this process
+        `{project-root}/data/` in .csv format, or as camel cased .jsonl files when
+        `fmt` is 'jsonl'. The following dataset files will be created during this
+        process
 
         * company-data
         * invoice-data
@@ -441,19 +618,25 @@ class ErpDataGenerator:
             batch_size (int): The size of each batch when generating the datasets
             total_companies (int): The total number of companies to generate
             inv_per_period (int): The number of invoices to generate for each period
+            seed (int): The seed for the dataset
+            fmt (str): The output format, one of `OUTPUT_FORMATS`
 
         Returns:
             None
         """
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}, expected one of {OUTPUT_FORMATS}")
+
         # Generate the companies and return a list of ids
-        company_list = generate_companies(parallel, batch_size, total_companies)
+        company_list = generate_companies(parallel, batch_size, total_companies,
+                                          seed, fmt)
 
         # For each period we will generate invoices and payments
         period_ranges = create_date_ranges()
 
         # Generate and output invoices
         invoice_ids = generate_invoices(parallel, period_ranges, company_list,
-                                        inv_per_period)
+                                        inv_per_period, seed=seed, fmt=fmt)
 
         # Generate and output payments
-        generate_payments(parallel, invoice_ids)
+        generate_payments(parallel, invoice_ids, seed, fmt)
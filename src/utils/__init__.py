@@ -1,2 +1,3 @@
-from ._string_utils import serialize_to_camel, serialize_payment
+from ._string_utils import serialize_payment, snake_to_camel
+from ._serializers import compile_serializer, serialize_to_camel, write_jsonl
 from ._func_utils import func_timer
@@ -0,0 +1,161 @@
+import json
+import types
+import typing
+from dataclasses import fields, is_dataclass
+from datetime import date
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Iterable
+
+from src.models import Invoice, Payment
+from src.utils._string_utils import snake_to_camel
+
+EXPORT_PROPERTIES = {
+    Invoice: ('total',),
+    Payment: ('total_remaining',),
+}
+"""Computed properties exported alongside the dataclass fields of a model."""
+
+_encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+
+
+def _iso(value: date | None) -> str | None:
+    return None if value is None else value.isoformat()
+
+
+def _resolve(tp) -> tuple[type | None, bool]:
+    """
+    Unwrap an optional field type.
+
+    Returns:
+        A tuple of the underlying type, or the item type for lists, and whether
+        it holds a list.
+    """
+    if isinstance(tp, types.UnionType) or typing.get_origin(tp) is typing.Union:
+        args = [a for a in typing.get_args(tp) if a is not type(None)]
+        tp = args[0] if len(args) == 1 else None
+    if typing.get_origin(tp) is list:
+        args = typing.get_args(tp)
+        return (args[0] if args else None), True
+    return tp, False
+
+
+def _list_of(serialize: Callable[[object], dict]) -> Callable[[list | None], list | None]:
+    def convert(items):
+        return None if items is None else [serialize(i) for i in items]
+    return convert
+
+
+def _flattened(serialize: Callable[[object], dict],
+               keys: tuple[str, ...]) -> Callable[[object], dict]:
+    empty = dict.fromkeys(keys)
+
+    def convert(value):
+        return empty if value is None else serialize(value)
+    return convert
+
+
+def _field_entries(cls: type, camel: bool, include: tuple[str, ...] | None,
+                   prefix: str = '') -> list[tuple[str | None, Callable, Callable | None]]:
+    """
+    Build a `(key, getter, converter)` entry for each exported field of `cls`.
+    Nested dataclasses get a key of None and a converter returning their
+    flattened fields, with keys prefixed by the path to the nested object.
+    """
+    types_by_name = {f.name: f.type for f in fields(cls)}
+    names = include if include is not None else \
+        tuple(types_by_name) + EXPORT_PROPERTIES.get(cls, ())
+
+    entries = []
+    for name in names:
+        tp, is_list = _resolve(types_by_name.get(name))
+        key = prefix + (snake_to_camel(name) if camel else name)
+        get = attrgetter(name)
+        if is_list and tp is not None and is_dataclass(tp):
+            entries.append((key, get, _list_of(compile_serializer(tp, camel))))
+        elif not is_list and tp is not None and is_dataclass(tp):
+            nested = _field_entries(tp, camel, None, key + '.')
+            keys = tuple(k for k, _, _ in nested)
+            entries.append((None, get, _flattened(_serializer(nested), keys)))
+        elif tp is date:
+            entries.append((key, get, _iso))
+        else:
+            entries.append((key, get, None))
+    return entries
+
+
+def _serializer(entries: list[tuple[str | None, Callable, Callable | None]]) -> Callable[[object], dict]:
+    entries = tuple(entries)
+
+    def serialize(obj) -> dict:
+        row = {}
+        for key, get, convert in entries:
+            if convert is None:
+                row[key] = get(obj)
+            elif key is None:
+                row.update(convert(get(obj)))
+            else:
+                row[key] = convert(get(obj))
+        return row
+    return serialize
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(cls: type, camel: bool = False,
+                       include: tuple[str, ...] | None = None) -> Callable[[object], dict]:
+    """
+    Build a function that serializes instances of the given dataclass into a
+    flat dict. The key names and attribute getters are worked out once per
+    model from its field definitions, so no per-object introspection or key
+    conversion takes place. Nested dataclasses are flattened into dotted keys
+    (e.g. `displayContact.mailAddress.city`), lists of dataclasses become
+    arrays of objects serialized the same way and dates are formatted as ISO
+    strings.
+
+    >>> from src.models import MailAddress
+    >>> compile_serializer(MailAddress, camel=True)(MailAddress(city='Boise'))['city']
+    'Boise'
+
+    Args:
+        cls (): The dataclass to build a serializer for.
+        camel (): Whether to camel case the output keys.
+        include (): The top level fields or properties to output, in order.
+            Defaults to all fields plus any `EXPORT_PROPERTIES` of the model.
+
+    Returns:
+        A function taking an instance of `cls` and returning a flat dict.
+    """
+    return _serializer(_field_entries(cls, camel, include))
+
+
+def serialize_to_camel(obj) -> dict:
+    """
+    Convert the given object into an object with camel cased property labels
+    """
+    return compile_serializer(type(obj), camel=True)(obj)
+
+
+def write_jsonl(path: str, objects: Iterable, camel: bool = True) -> int:
+    """
+    Write model objects to a JSON Lines file using the compiled serializers,
+    one line per object. Invoice line items and payment items are written as
+    nested arrays.
+
+    Args:
+        path (): The file to write to.
+        objects (): The Company, Invoice or Payment objects to write.
+        camel (): Whether to camel case the output keys.
+
+    Returns:
+        The number of lines written.
+    """
+    serializers = {}
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for obj in objects:
+            cls = type(obj)
+            if cls not in serializers:
+                serializers[cls] = compile_serializer(cls, camel)
+            f.write(_encode(serializers[cls](obj)) + '\n')
+            count += 1
+    return count
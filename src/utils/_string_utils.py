@@ -1,27 +1,24 @@
+from functools import lru_cache
+
 from src.models import Payment
 
 
-def serialize_to_camel(obj):
+def serialize_payment(payment: Payment) -> list[dict]:
     """
-    Convert the given object into an object with camel cased property labels
+    Flatten a payment into the rows written to the payment csv, one for each
+    payment item.
     """
-    return {snake_to_camel(k): v for k, v in obj.__dict__.items()}
-
-
-def serialize_payment(payment: Payment) -> list[dict]:
     if not payment.payment_items:
-        return {}
+        return []
     base_payment = payment.summary
 
-    results = []
-    for p_item in payment.payment_items:
-        item_details = {"invoice_id": p_item.invoice_id, "line_amount": p_item.amount}
-        item_details.update(base_payment)
-        results.append(item_details)
-
-    return results
+    return [
+        {"invoice_id": p_item.invoice_id, "line_amount": p_item.amount, **base_payment}
+        for p_item in payment.payment_items
+    ]
 
 
+@lru_cache(maxsize=None)
 def snake_to_camel(string: str) -> str:
     """
     Converts the snake case to a camel cased string.
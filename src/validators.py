@@ -0,0 +1,325 @@
+import os
+import re
+from dataclasses import dataclass, field
+from glob import glob
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+COMPANY_ID_PREFIX = 'C'
+MAX_SAMPLES = 10
+
+ID_PATTERN = '[0-9]{1,18}'
+"""Ids are ascii digits short enough to always fit in an int64."""
+
+ID_COLUMNS = {'customer_id': str, 'invoice_id': str, 'payment_id': str}
+
+
+@dataclass
+class ValidationReport:
+    """
+    Outcome of a dataset validation run. Issues are counted per check and a
+    small sample of offending ids is kept for each one.
+    """
+    companies: int = 0
+    invoices: int = 0
+    payment_lines: int = 0
+    elapsed: float = 0.0
+    issues: dict[str, int] = field(default_factory=dict)
+    samples: dict[str, list] = field(default_factory=dict)
+
+    @property
+    def rows(self) -> int:
+        return self.companies + self.invoices + self.payment_lines
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not any(self.issues.values())
+
+    def add_issue(self, check: str, ids) -> None:
+        """
+        Record the offending ids for the given check.
+
+        Args:
+            check (): The name of the failed check.
+            ids (): An array of ids that failed the check.
+        """
+        ids = np.asarray(ids)
+        if not ids.size:
+            return
+        self.issues[check] = self.issues.get(check, 0) + int(ids.size)
+        samples = self.samples.setdefault(check, [])
+        samples.extend(ids[:MAX_SAMPLES - len(samples)].tolist())
+
+    def __str__(self) -> str:
+        lines = [
+            f"Companies: {self.companies:,}",
+            f"Invoices: {self.invoices:,}",
+            f"Payment lines: {self.payment_lines:,}",
+            f"Validated {self.rows:,} rows in {self.elapsed:.3f}s "
+            f"({self.rows_per_sec:,.0f} rows/sec)",
+        ]
+        if self.ok:
+            lines.append("No issues found")
+        for check, count in self.issues.items():
+            lines.append(f"{check}: {count:,} (e.g. {self.samples[check]})")
+        return '\n'.join(lines)
+
+
+def company_codes(customer_ids: pd.Series) -> np.ndarray:
+    """
+    Convert generated customer ids (e.g. `C42`) into integer codes so they can
+    be held in a compact sorted array rather than a set of strings. Ids that do
+    not follow the generated format are mapped to -1.
+
+    Args:
+        customer_ids (): A series of customer id strings.
+
+    Returns:
+        An int64 array of the numeric part of each customer id.
+    """
+    ids = customer_ids.fillna('').astype(str)
+    valid = ids.str.fullmatch(re.escape(COMPANY_ID_PREFIX) + ID_PATTERN).to_numpy()
+    codes = np.full(len(ids), -1, dtype=np.int64)
+    codes[valid] = ids[valid].str[len(COMPANY_ID_PREFIX):].astype(np.int64).to_numpy()
+    return codes
+
+
+def to_ids(values: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert an id column into integers. Values that are not plain digit strings
+    are mapped to -1.
+
+    Returns:
+        A tuple of the int64 ids and a mask of which values were valid.
+    """
+    values = values.fillna('').astype(str)
+    valid = values.str.fullmatch(ID_PATTERN).to_numpy()
+    ids = np.full(len(values), -1, dtype=np.int64)
+    ids[valid] = values[valid].astype(np.int64).to_numpy()
+    return ids, valid
+
+
+def to_cents(amounts: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Convert currency amounts into integer cents so sums accumulate exactly.
+    Missing or non numeric amounts are mapped to 0.
+
+    Returns:
+        A tuple of the int64 cents and a mask of which amounts were valid.
+    """
+    numbers = pd.to_numeric(amounts, errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(numbers)
+    return np.rint(np.where(valid, numbers, 0) * 100).astype(np.int64), valid
+
+
+def contains(sorted_ids: np.ndarray, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Look up ids in a sorted id array.
+
+    Args:
+        sorted_ids (): The sorted array to search.
+        ids (): The ids to look for.
+
+    Returns:
+        A tuple of the position of each id in `sorted_ids` and a mask of which
+        ids were actually found.
+    """
+    idx = np.searchsorted(sorted_ids, ids)
+    idx[idx == len(sorted_ids)] = 0
+    found = sorted_ids[idx] == ids if len(sorted_ids) else np.zeros(len(ids), bool)
+    return idx, found
+
+
+def duplicates(sorted_ids: np.ndarray) -> np.ndarray:
+    """
+    Find the ids that occur more than once in a sorted id array.
+    """
+    return np.unique(sorted_ids[1:][sorted_ids[1:] == sorted_ids[:-1]])
+
+
+def read_chunks(paths: list[str], columns: list[str], chunk_size: int):
+    """
+    Stream only the requested columns from each csv in chunks of `chunk_size`
+    rows.
+    """
+    for path in paths:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size,
+                               dtype=ID_COLUMNS)
+
+
+def validate_companies(path: str, report: ValidationReport,
+                       chunk_size: int) -> np.ndarray:
+    """
+    Check that every company in the company dataset has a unique customer id.
+
+    Returns:
+        The sorted array of company id codes.
+    """
+    chunks = []
+    for chunk in read_chunks([path], ['customer_id'], chunk_size):
+        codes = company_codes(chunk['customer_id'])
+        report.add_issue('malformed_customer_id',
+                         chunk['customer_id'][codes < 0].to_numpy())
+        chunks.append(codes[codes >= 0])
+        report.companies += len(chunk)
+
+    company_ids = np.sort(np.concatenate(chunks)) if chunks \
+        else np.empty(0, np.int64)
+    report.add_issue('duplicate_customer_id', duplicates(company_ids))
+    return company_ids
+
+
+def validate_invoices(paths: list[str], company_ids: np.ndarray,
+                      report: ValidationReport,
+                      chunk_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Check that invoice ids are unique and that every invoice belongs to a
+    company from the company dataset. Rows with a malformed invoice id are
+    reported and skipped.
+
+    Returns:
+        A tuple of the sorted invoice ids, their amounts in cents and a mask of
+        which amounts were valid.
+    """
+    id_chunks, amount_chunks, valid_chunks = [], [], []
+    for chunk in read_chunks(paths, ['invoice_id', 'customer_id', 'amount'],
+                             chunk_size):
+        report.invoices += len(chunk)
+        ids, valid = to_ids(chunk['invoice_id'])
+        report.add_issue('malformed_invoice_id', chunk['invoice_id'][~valid].to_numpy())
+        chunk, ids = chunk[valid], ids[valid]
+
+        _, found = contains(company_ids, company_codes(chunk['customer_id']))
+        report.add_issue('unknown_invoice_customer', ids[~found])
+
+        cents, valid_amount = to_cents(chunk['amount'])
+        report.add_issue('malformed_invoice_amount', ids[~valid_amount])
+        id_chunks.append(ids)
+        amount_chunks.append(cents)
+        valid_chunks.append(valid_amount)
+
+    if not id_chunks:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, bool)
+
+    invoice_ids = np.concatenate(id_chunks)
+    order = np.argsort(invoice_ids, kind='stable')
+    invoice_ids = invoice_ids[order]
+    report.add_issue('duplicate_invoice_id', duplicates(invoice_ids))
+    return invoice_ids, np.concatenate(amount_chunks)[order], \
+        np.concatenate(valid_chunks)[order]
+
+
+def validate_payments(paths: list[str], invoice_ids: np.ndarray,
+                      invoice_cents: np.ndarray, valid_amounts: np.ndarray,
+                      report: ValidationReport, chunk_size: int,
+                      tolerance_cents: int) -> None:
+    """
+    Check that every payment line applies to a known invoice, that the lines
+    applied to each invoice add up to its amount, that each payment id applies
+    to a single invoice and that payment ids are not reused across payment
+    batches. Rows with a malformed id or amount are reported and skipped.
+    """
+    paid_cents = np.zeros(len(invoice_ids), dtype=np.int64)
+    seen_payment_ids = np.empty(0, np.int64)
+
+    for path in paths:
+        batch_pairs = []
+        for chunk in read_chunks([path], ['invoice_id', 'payment_id', 'line_amount'],
+                                 chunk_size):
+            report.payment_lines += len(chunk)
+            payment_ids, valid_payment = to_ids(chunk['payment_id'])
+            report.add_issue('malformed_payment_id',
+                             chunk['payment_id'][~valid_payment].to_numpy())
+            ids, valid_invoice = to_ids(chunk['invoice_id'])
+            report.add_issue('malformed_invoice_id',
+                             chunk['invoice_id'][~valid_invoice].to_numpy())
+            cents, valid_amount = to_cents(chunk['line_amount'])
+            report.add_issue('malformed_line_amount',
+                             payment_ids[valid_payment & ~valid_amount])
+
+            keep = valid_payment & valid_invoice & valid_amount
+            payment_ids, ids, cents = payment_ids[keep], ids[keep], cents[keep]
+
+            idx, found = contains(invoice_ids, ids)
+            report.add_issue('unknown_payment_invoice', ids[~found])
+            np.add.at(paid_cents, idx[found], cents[found])
+            batch_pairs.append(np.unique(np.column_stack((payment_ids, ids)), axis=0))
+
+        if batch_pairs:
+            pairs = np.unique(np.concatenate(batch_pairs), axis=0)
+            # Pairs are sorted by payment id, so a repeated payment id means the
+            # payment was applied to more than one invoice
+            report.add_issue('payment_id_multiple_invoices', duplicates(pairs[:, 0]))
+
+            batch_ids = np.unique(pairs[:, 0])
+            _, reused = contains(seen_payment_ids, batch_ids)
+            report.add_issue('duplicate_payment_id', batch_ids[reused])
+            seen_payment_ids = np.union1d(seen_payment_ids, batch_ids)
+
+    mismatched = valid_amounts & (np.abs(paid_cents - invoice_cents) > tolerance_cents)
+    report.add_issue('payment_total_mismatch', invoice_ids[mismatched])
+
+
+def validate_dataset(data_dir: str = 'data', chunk_size: int = 100_000,
+                     tolerance_cents: int = 1) -> ValidationReport:
+    """
+    Validate a generated dataset by streaming over the company, invoice and
+    payment outputs in chunks. Ids are kept in sorted integer arrays and
+    payment lines are accumulated into per-invoice totals as they are read,
+    so memory is bounded by the number of ids rather than the size of the
+    files. The following checks are made:
+
+    * customer ids are unique
+    * invoice ids are unique and invoice customers exist in the company data
+    * payment invoice ids exist in the invoice data
+    * payment line amounts sum to the invoice amount
+    * each payment id applies to a single invoice and is not reused across
+      payment batches
+    * ids and amounts are well formed, otherwise the row is reported and
+      skipped
+    * the company file and at least one invoice and payment file exist
+
+    Args:
+        data_dir (): The directory the dataset was generated into.
+        chunk_size (): The number of rows to read at a time.
+        tolerance_cents (): The allowed difference between an invoice amount and
+            the sum of its payment lines.
+
+    Returns:
+        A ValidationReport with row counts, throughput and any issues found.
+    """
+    report = ValidationReport()
+    start = perf_counter()
+
+    company_path = os.path.join(data_dir, 'company-data.csv')
+    if not os.path.exists(company_path):
+        report.add_issue('missing_file', [company_path])
+        return report
+
+    company_ids = validate_companies(company_path, report, chunk_size)
+
+    invoice_pattern = os.path.join(data_dir, 'invoices', 'invoices_*.csv')
+    invoice_paths = sorted(glob(invoice_pattern))
+    payment_pattern = os.path.join(data_dir, 'payments', 'payments_batch_*')
+    payment_paths = sorted(glob(payment_pattern))
+    report.add_issue('missing_file', [
+        pattern for pattern, paths in ((invoice_pattern, invoice_paths),
+                                       (payment_pattern, payment_paths))
+        if not paths
+    ])
+
+    invoice_ids, invoice_cents, valid_amounts = validate_invoices(
+        invoice_paths, company_ids, report, chunk_size)
+
+    validate_payments(
+        payment_paths, invoice_ids, invoice_cents, valid_amounts, report, chunk_size,
+        tolerance_cents)
+
+    report.elapsed = perf_counter() - start
+    return report
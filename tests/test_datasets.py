@@ -0,0 +1,111 @@
+import asyncio
+import glob
+
+import numpy as np
+import pandas as pd
+import pytest
+from joblib import Parallel
+
+from src.generators import ErpDataGenerator, INVOICE_STREAM, fake, stream_key
+from src.utils import serialize_payment
+
+TOTAL_COMPANIES = 230
+BATCH_SIZE = 50
+INV_PER_PERIOD = 20
+
+
+@pytest.fixture(scope='module')
+def bulk_output(tmp_path_factory):
+    """
+    Run the bulk pipeline with a company count that is not a multiple of the
+    batch size and load the csv outputs.
+    """
+    data_dir = tmp_path_factory.mktemp('bulk')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(data_dir)
+        (data_dir / 'data' / 'invoices').mkdir(parents=True)
+        (data_dir / 'data' / 'payments').mkdir()
+        asyncio.run(ErpDataGenerator.generate_company_dataset(
+            Parallel(n_jobs=1), BATCH_SIZE, TOTAL_COMPANIES, INV_PER_PERIOD))
+
+    read = lambda pattern: pd.concat(
+        pd.read_csv(f, dtype={'customer_id': str, 'invoice_id': str,
+                              'payment_id': str, 'display_contact.mail_address.zip': str})
+        for f in glob.glob(str(data_dir / 'data' / pattern))
+    )
+    return read('company-data.csv'), read('invoices/*.csv'), read('payments/*')
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return ErpDataGenerator.dataset(TOTAL_COMPANIES, INV_PER_PERIOD)
+
+
+def test_companies_match_bulk(bulk_output, dataset):
+    companies, _, _ = bulk_output
+    assert len(companies) == len(dataset.companies)
+
+    for company, (_, row) in zip(dataset.companies, companies.iterrows()):
+        assert company.customer_id == row['customer_id']
+        assert company.name == row['name']
+        assert company.display_contact.print_as == row['display_contact.print_as']
+        assert company.display_contact.mail_address.zip == \
+            row['display_contact.mail_address.zip']
+
+
+def test_invoices_match_bulk(bulk_output, dataset):
+    _, invoices, _ = bulk_output
+    invoices = invoices.set_index('invoice_id')
+    assert len(invoices) == len(dataset.invoices)
+
+    for invoice in dataset.invoices:
+        row = invoices.loc[invoice.invoice_id]
+        assert invoice.customer_id == row['customer_id']
+        assert invoice.bill_to_contact_name == row['bill_to_contact_name']
+        assert str(invoice.date_created) == row['date_created']
+        assert invoice.total == row['amount']
+
+
+def test_payments_match_bulk(bulk_output, dataset):
+    _, _, payments = bulk_output
+    lines = payments.groupby('payment_id')
+    assert lines.ngroups == len(dataset.payments)
+
+    for payment_id in ['1', '137', str(len(dataset.payments))]:
+        rows = serialize_payment(dataset.payment(int(payment_id)))
+        expected = lines.get_group(payment_id)
+        assert [r['invoice_id'] for r in rows] == expected['invoice_id'].tolist()
+        assert [r['line_amount'] for r in rows] == expected['line_amount'].tolist()
+        assert [r['date_posted'] for r in rows] == expected['date_posted'].tolist()
+
+
+def test_dataset_leaves_shared_faker_untouched(dataset):
+    fake.seed_instance(7)
+    expected = fake.name()
+    fake.seed_instance(7)
+    dataset.company(1)
+    assert fake.name() == expected
+
+
+@pytest.mark.parametrize('seed, counter', [(-1, 1), (2 ** 64, 1), (42, -1), (42, 2 ** 48)])
+def test_stream_key_rejects_out_of_range(seed, counter):
+    with pytest.raises(ValueError):
+        stream_key(seed, INVOICE_STREAM, counter)
+
+
+def test_numpy_ids(dataset):
+    assert dataset.company(np.int64(5)) == dataset.company(5)
+    assert dataset.invoice(np.int64(5)) == dataset.invoice(5)
+    assert dataset.payment(np.int64(5)) == dataset.payment(5)
+    assert dataset.companies[np.int64(4)] == dataset.company(5)
+    assert dataset.invoices[np.int64(4)] == dataset.invoice(5)
+    assert stream_key(np.uint64(42), INVOICE_STREAM, np.int64(7)) == \
+        stream_key(42, INVOICE_STREAM, 7)
+
+
+@pytest.mark.parametrize('index', [1.5, '3'])
+def test_non_integer_index(dataset, index):
+    with pytest.raises(TypeError):
+        dataset.invoices[index]
+    with pytest.raises(TypeError):
+        dataset.invoice(index)
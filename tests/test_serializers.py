@@ -0,0 +1,108 @@
+import asyncio
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+from joblib import Parallel
+
+from src.generators import ErpDataGenerator, write_payment_batch
+from src.models import Payment, PaymentItem
+from src.utils import serialize_payment, serialize_to_camel, write_jsonl
+
+
+def make_payment(payment_id: str, amounts: list[float]) -> Payment:
+    day = date(2024, 1, 2)
+    return Payment(
+        customer_id='C1', payment_id=payment_id, payment_amount=sum(amounts),
+        payment_method='cash', base_curr='USD', currency_code='USD',
+        date_created=day, date_received=day, date_posted=day,
+        payment_items=[PaymentItem('7', payment_id, a, day, day) for a in amounts]
+    )
+
+
+@pytest.fixture
+def dataset():
+    return ErpDataGenerator.dataset(20, 5)
+
+
+def test_serialize_payment_matches_summary_rows():
+    payment = make_payment('5', [40.0, 60.25])
+
+    expected = []
+    for p_item in payment.payment_items:
+        item_details = {"invoice_id": p_item.invoice_id, "line_amount": p_item.amount}
+        item_details.update(payment.summary)
+        expected.append(item_details)
+
+    rows = serialize_payment(payment)
+    assert rows == expected
+    assert [list(r) for r in rows] == [list(r) for r in expected]
+
+
+def test_payment_csv_matches_json_normalize(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'payments').mkdir(parents=True)
+    payments = [make_payment('1', [10.5]), make_payment('2', [1.0, 2.25])]
+
+    write_payment_batch(1, payments)
+
+    rows = [i for p in payments for i in serialize_payment(p)]
+    expected = pd.json_normalize(json.loads(json.dumps(rows)))
+    expected['total_remaining'] = 0
+    assert (tmp_path / 'data' / 'payments' / 'payments_batch_1').read_text() == \
+        expected.to_csv(index=False)
+
+
+def test_jsonl_round_trip(tmp_path, dataset):
+    company, invoice, payment = dataset.company(3), dataset.invoice(3), dataset.payment(3)
+    path = tmp_path / 'export.jsonl'
+
+    assert write_jsonl(str(path), [company, invoice, payment]) == 3
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+
+    assert lines[0] == serialize_to_camel(company)
+    assert lines[0]['customerId'] == company.customer_id
+    assert lines[0]['displayContact.mailAddress.city'] == \
+        company.display_contact.mail_address.city
+
+    assert lines[1]['invoiceId'] == invoice.invoice_id
+    assert lines[1]['dateDue'] == invoice.date_due.isoformat()
+    assert lines[1]['total'] == invoice.total
+    assert lines[1]['invoiceItems'] == [{
+        'amount': invoice.total, 'invoiceId': invoice.invoice_id, 'invoiceLine': 1,
+        'accountLabel': '4000', 'locationId': None, 'itemId': None, 'memo': None
+    }]
+
+    assert lines[2]['paymentId'] == payment.payment_id
+    assert lines[2]['totalRemaining'] == payment.total_remaining
+    assert [i['amount'] for i in lines[2]['paymentItems']] == \
+        [i.amount for i in payment.payment_items]
+
+
+def test_generate_jsonl_dataset(tmp_path, monkeypatch, dataset):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'payments').mkdir(parents=True)
+    asyncio.run(ErpDataGenerator.generate_company_dataset(
+        Parallel(n_jobs=1), 10, len(dataset.companies), dataset.inv_per_period,
+        fmt='jsonl'))
+
+    read = lambda pattern: [
+        json.loads(line) for f in sorted(tmp_path.glob(pattern))
+        for line in f.read_text().splitlines()
+    ]
+    companies = read('data/companies/*.jsonl')
+    invoices = read('data/invoices/*.jsonl')
+    payments = read('data/payments/*.jsonl')
+
+    assert len(companies) == len(dataset.companies)
+    assert len(invoices) == len(payments) == len(dataset.invoices)
+    assert companies[0] == serialize_to_camel(dataset.company(1))
+    assert {i['invoiceId'] for i in invoices} == \
+        {i['invoiceId'] for p in payments for i in p['paymentItems']}
+
+
+def test_generate_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        asyncio.run(ErpDataGenerator.generate_company_dataset(
+            Parallel(n_jobs=1), 10, 20, 5, fmt='xml'))
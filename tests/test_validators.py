@@ -0,0 +1,129 @@
+import pandas as pd
+import pytest
+
+from src.validators import validate_dataset
+
+COMPANIES = [{'customer_id': f'C{i}', 'name': f'Company {i}'} for i in range(1, 4)]
+
+INVOICES = {
+    'invoices_2024_1.csv': [
+        {'invoice_id': '1', 'customer_id': 'C1', 'amount': 100.00},
+        {'invoice_id': '2', 'customer_id': 'C2', 'amount': 250.50},
+    ],
+    'invoices_2024_2.csv': [
+        {'invoice_id': '3', 'customer_id': 'C3', 'amount': 75.25},
+    ],
+}
+
+PAYMENTS = {
+    'payments_batch_1': [
+        {'invoice_id': '1', 'line_amount': 40.00, 'payment_id': '1'},
+        {'invoice_id': '1', 'line_amount': 60.00, 'payment_id': '1'},
+        {'invoice_id': '2', 'line_amount': 250.50, 'payment_id': '2'},
+    ],
+    'payments_batch_2': [
+        {'invoice_id': '3', 'line_amount': 75.25, 'payment_id': '3'},
+    ],
+}
+
+
+def write_dataset(data_dir, companies=None, invoices=None, payments=None):
+    """
+    Write a small dataset in the layout the generator produces, replacing any
+    of the files with the supplied rows.
+    """
+    (data_dir / 'invoices').mkdir(parents=True)
+    (data_dir / 'payments').mkdir()
+    pd.DataFrame(companies or COMPANIES).to_csv(data_dir / 'company-data.csv', index=False)
+    for name, rows in {**INVOICES, **(invoices or {})}.items():
+        pd.DataFrame(rows).to_csv(data_dir / 'invoices' / name, index=False)
+    for name, rows in {**PAYMENTS, **(payments or {})}.items():
+        pd.DataFrame(rows).to_csv(data_dir / 'payments' / name, index=False)
+    return data_dir
+
+
+def test_valid_dataset(tmp_path):
+    report = validate_dataset(str(write_dataset(tmp_path)), chunk_size=2)
+
+    assert report.ok
+    assert (report.companies, report.invoices, report.payment_lines) == (3, 3, 4)
+
+
+@pytest.mark.parametrize('changes, issues', [
+    ({'companies': COMPANIES + [{'customer_id': 'C2', 'name': 'Again'}]},
+     {'duplicate_customer_id': [2]}),
+    ({'invoices': {'invoices_2024_2.csv': [
+        {'invoice_id': '3', 'customer_id': 'C9', 'amount': 75.25}]}},
+     {'unknown_invoice_customer': [3]}),
+    ({'invoices': {'invoices_2024_2.csv': [
+        {'invoice_id': '3', 'customer_id': 'C3', 'amount': 75.25},
+        {'invoice_id': '2', 'customer_id': 'C3', 'amount': 0.00}]}},
+     {'duplicate_invoice_id': [2]}),
+    ({'payments': {'payments_batch_2': [
+        {'invoice_id': '3', 'line_amount': 75.25, 'payment_id': '2'}]}},
+     {'duplicate_payment_id': [2]}),
+    ({'payments': {'payments_batch_2': [
+        {'invoice_id': '3', 'line_amount': 75.00, 'payment_id': '1'},
+        {'invoice_id': '3', 'line_amount': 0.25, 'payment_id': '3'}]}},
+     {'duplicate_payment_id': [1]}),
+    ({'payments': {'payments_batch_1': PAYMENTS['payments_batch_1'] + [
+        {'invoice_id': '3', 'line_amount': 0.00, 'payment_id': '2'}]}},
+     {'payment_id_multiple_invoices': [2]}),
+    ({'payments': {'payments_batch_2': [
+        {'invoice_id': '3', 'line_amount': 70.00, 'payment_id': '3'}]}},
+     {'payment_total_mismatch': [3]}),
+    ({'payments': {'payments_batch_2': [
+        {'invoice_id': '9', 'line_amount': 75.25, 'payment_id': '3'}]}},
+     {'unknown_payment_invoice': [9], 'payment_total_mismatch': [3]}),
+])
+def test_reports_issue(tmp_path, changes, issues):
+    report = validate_dataset(str(write_dataset(tmp_path, **changes)), chunk_size=2)
+
+    assert report.samples == issues
+
+
+def test_reports_malformed_rows(tmp_path):
+    data_dir = write_dataset(
+        tmp_path,
+        companies=COMPANIES + [{'customer_id': 'C99999999999999999999', 'name': 'Big'},
+                               {'customer_id': 'C²', 'name': 'Unicode'}],
+        invoices={'invoices_2024_2.csv': [
+            {'invoice_id': '3', 'customer_id': 'C3', 'amount': None},
+            {'invoice_id': '1e3', 'customer_id': 'C3', 'amount': 1.00},
+            {'invoice_id': '3.0', 'customer_id': 'C3', 'amount': 1.00}]},
+        payments={'payments_batch_2': [
+            {'invoice_id': '3', 'line_amount': 75.25, 'payment_id': 'abc'},
+            {'invoice_id': '3', 'line_amount': None, 'payment_id': '3'}]}
+    )
+    report = validate_dataset(str(data_dir), chunk_size=2)
+
+    assert report.samples == {
+        'malformed_customer_id': ['C99999999999999999999', 'C²'],
+        'malformed_invoice_amount': [3],
+        'malformed_invoice_id': ['1e3', '3.0'],
+        'malformed_payment_id': ['abc'],
+        'malformed_line_amount': [3],
+    }
+
+
+def test_large_ids_stay_distinct(tmp_path):
+    data_dir = write_dataset(tmp_path, invoices={'invoices_2024_2.csv': [
+        {'invoice_id': '9007199254740992', 'customer_id': 'C3', 'amount': 0.00},
+        {'invoice_id': '9007199254740993', 'customer_id': 'C3', 'amount': 0.00},
+        {'invoice_id': '3', 'customer_id': 'C3', 'amount': 75.25}]})
+
+    assert validate_dataset(str(data_dir), chunk_size=2).ok
+
+
+def test_reports_missing_company_file(tmp_path):
+    report = validate_dataset(str(tmp_path))
+
+    assert report.samples == {'missing_file': [str(tmp_path / 'company-data.csv')]}
+
+
+def test_reports_missing_invoice_and_payment_files(tmp_path):
+    pd.DataFrame(COMPANIES).to_csv(tmp_path / 'company-data.csv', index=False)
+    report = validate_dataset(str(tmp_path))
+
+    assert report.issues == {'missing_file': 2}
+    assert (report.companies, report.invoices, report.payment_lines) == (3, 0, 0)